@@ -3,6 +3,11 @@
 NOTE: to add your telescope's instrument overlays, add a module to this
 directory, import it here and assign it in inst_dict.  Follow examples in
 subaru.py .
+
+Overlays should add their graphics objects with FOV.add_object(), which
+records them in the `objs` list.  The InsFov plugin caches overlays and
+puts a cached one back on the canvas from `objs` when the instrument is
+selected again; overlays that leave `objs` empty are rebuilt each time.
 """
 inst_dict = dict()
 
@@ -2,9 +2,8 @@
 subaru.py -- Subaru instrument overlays
 
 """
-import numpy as np
-from astropy.coordinates import Angle
-from astropy import units as u
+import math
+from types import MappingProxyType
 
 from spot.plugins.InsFov import FOV
 
@@ -32,11 +31,11 @@ class AO188_FOV(FOV):
                          color=self.ao_color,
                          bgcolor='floralwhite', bgalpha=0.8,
                          rot_deg=self.rot_deg))
-        self.canvas.add(self.ao_circ)
+        self.add_object(self.ao_circ)
 
     def set_scale(self, scale_x, scale_y):
         # NOTE: sign of scale val indicates orientation
-        self.scale = np.mean((abs(scale_x), abs(scale_y)))
+        self.scale = 0.5 * (abs(scale_x) + abs(scale_y))
 
         self.ao_radius = self.ao_fov * 0.5 / self.scale
         pt = self.ao_circ.objects[0].points[0][:2]
@@ -45,20 +44,16 @@ class AO188_FOV(FOV):
     def set_pos(self, pt):
         x, y = pt
         r = self.ao_radius
-        self.ao_circ.objects[0].x = x
-        self.ao_circ.objects[0].y = y
+        self.update_labels(r)
+        self.ao_circ.objects[0].points[0] = (x, y)
         self.ao_circ.objects[0].radius = r
-        self.ao_circ.objects[1].x = x
-        self.ao_circ.objects[1].y = y + r
+        self.ao_circ.objects[1].points[0] = (x, y + r)
 
         self.canvas.update_canvas()
 
     def rotate(self, rot_deg):
         self.rot_deg = rot_deg
 
-    def remove(self):
-        self.canvas.delete_object(self.ao_circ)
-
 
 class IRCS_FOV(AO188_FOV):
     def __init__(self, canvas, pt):
@@ -79,7 +74,7 @@ class IRCS_FOV(AO188_FOV):
                          text="IRCS FOV (54x54 arcsec)",
                          color=self.ircs_color,
                          rot_deg=self.rot_deg))
-        self.canvas.add(self.ircs_box)
+        self.add_object(self.ircs_box)
 
     def set_scale(self, scale_x, scale_y):
         super().set_scale(scale_x, scale_y)
@@ -94,21 +89,14 @@ class IRCS_FOV(AO188_FOV):
         x, y = pt
         r = self.ircs_radius
         self.ircs_box.objects[0].radius = r
-        self.ircs_box.objects[0].x = x
-        self.ircs_box.objects[0].y = y
-        self.ircs_box.objects[1].x = x - r
-        self.ircs_box.objects[1].y = y + r
+        self.ircs_box.objects[0].points[0] = (x, y)
+        self.ircs_box.objects[1].points[0] = (x - r, y + r)
 
         self.canvas.update_canvas()
 
     def rotate(self, rot_deg):
         super().rotate(rot_deg)
 
-    def remove(self):
-        super().remove()
-
-        self.canvas.delete_object(self.ircs_box)
-
 
 class IRD_FOV(AO188_FOV):
     def __init__(self, canvas, pt):
@@ -128,7 +116,7 @@ class IRD_FOV(AO188_FOV):
                          text="IRD FOV for FIM (20x10 arcsec)",
                          color=self.ird_color,
                          rot_deg=self.rot_deg))
-        self.canvas.add(self.ird_box)
+        self.add_object(self.ird_box)
 
     def set_scale(self, scale_x, scale_y):
         super().set_scale(scale_x, scale_y)
@@ -144,23 +132,16 @@ class IRD_FOV(AO188_FOV):
         super().set_pos(pt)
         x, y = pt
         xr, yr = self.ird_radius
-        self.ird_box.objects[0].x = x
-        self.ird_box.objects[0].y = y
+        self.ird_box.objects[0].points[0] = (x, y)
         self.ird_box.objects[0].xradius = xr
         self.ird_box.objects[0].yradius = yr
-        self.ird_box.objects[1].x = x - xr
-        self.ird_box.objects[1].y = y + yr
+        self.ird_box.objects[1].points[0] = (x - xr, y + yr)
 
         self.canvas.update_canvas()
 
     def rotate(self, rot_deg):
         super().rotate(rot_deg)
 
-    def remove(self):
-        super().remove()
-
-        self.canvas.delete_object(self.ird_box)
-
 
 class CS_FOV(FOV):
     def __init__(self, canvas, pt):
@@ -183,11 +164,11 @@ class CS_FOV(FOV):
                          text="6 arcmin",
                          color=self.cs_color,
                          rot_deg=self.rot_deg))
-        self.canvas.add(self.cs_circ)
+        self.add_object(self.cs_circ)
 
     def set_scale(self, scale_x, scale_y):
         # NOTE: sign of scale val indicates orientation
-        self.scale = np.mean((abs(scale_x), abs(scale_y)))
+        self.scale = 0.5 * (abs(scale_x) + abs(scale_y))
 
         self.cs_radius = self.cs_fov * 0.5 / self.scale
         pt = self.cs_circ.objects[0].points[0][:2]
@@ -197,20 +178,16 @@ class CS_FOV(FOV):
         super().set_pos(pt)
         x, y = pt
         r = self.cs_radius
-        self.cs_circ.objects[0].x = x
-        self.cs_circ.objects[0].y = y
+        self.update_labels(r)
+        self.cs_circ.objects[0].points[0] = (x, y)
         self.cs_circ.objects[0].radius = r
-        self.cs_circ.objects[1].x = x
-        self.cs_circ.objects[1].y = y + r
+        self.cs_circ.objects[1].points[0] = (x, y + r)
 
         self.canvas.update_canvas()
 
     def rotate(self, rot_deg):
         self.rot_deg = rot_deg
 
-    def remove(self):
-        self.canvas.delete_object(self.cs_circ)
-
 
 class COMICS_FOV(CS_FOV):
     def __init__(self, canvas, pt):
@@ -231,7 +208,7 @@ class COMICS_FOV(CS_FOV):
                          text="COMICS FOV (30x40 arcsec)",
                          color=self.comics_color,
                          rot_deg=self.rot_deg))
-        self.canvas.add(self.comics_box)
+        self.add_object(self.comics_box)
 
     def set_scale(self, scale_x, scale_y):
         super().set_scale(scale_x, scale_y)
@@ -246,20 +223,13 @@ class COMICS_FOV(CS_FOV):
         super().set_pos(pt)
         x, y = pt
         xr, yr = self.comics_radius
-        self.comics_box.objects[0].x = x
-        self.comics_box.objects[0].y = y
+        self.comics_box.objects[0].points[0] = (x, y)
         self.comics_box.objects[0].xradius = xr
         self.comics_box.objects[0].yradius = yr
-        self.comics_box.objects[1].x = x - xr
-        self.comics_box.objects[1].y = y + yr
+        self.comics_box.objects[1].points[0] = (x - xr, y + yr)
 
         self.canvas.update_canvas()
 
-    def remove(self):
-        super().remove()
-
-        self.canvas.delete_object(self.comics_box)
-
 
 class MOIRCS_FOV(CS_FOV):
     def __init__(self, canvas, pt):
@@ -282,7 +252,7 @@ class MOIRCS_FOV(CS_FOV):
                          rot_deg=self.rot_deg),
             self.dc.Line(x - xr, y, x + xr, y,
                          color=self.moircs_color, linewidth=2))
-        self.canvas.add(self.moircs_box)
+        self.add_object(self.moircs_box)
 
     def set_scale(self, scale_x, scale_y):
         super().set_scale(scale_x, scale_y)
@@ -297,24 +267,15 @@ class MOIRCS_FOV(CS_FOV):
         super().set_pos(pt)
         x, y = pt
         xr, yr = self.moircs_radius
-        self.moircs_box.objects[0].x = pt[0]
-        self.moircs_box.objects[0].y = pt[1]
+        self.moircs_box.objects[0].points[0] = (x, y)
         self.moircs_box.objects[0].xradius = xr
         self.moircs_box.objects[0].yradius = yr
-        self.moircs_box.objects[1].x = x - xr
-        self.moircs_box.objects[1].y = y + yr
-        self.moircs_box.objects[2].x1 = x - xr
-        self.moircs_box.objects[2].x2 = x + xr
-        self.moircs_box.objects[2].y1 = y
-        self.moircs_box.objects[2].y2 = y
+        self.moircs_box.objects[1].points[0] = (x - xr, y + yr)
+        self.moircs_box.objects[2].points[:] = ((x - xr, y),
+                                                (x + xr, y))
 
         self.canvas.update_canvas()
 
-    def remove(self):
-        super().remove()
-
-        self.canvas.delete_object(self.moircs_box)
-
 
 class SWIMS_FOV(CS_FOV):
     def __init__(self, canvas, pt):
@@ -337,7 +298,7 @@ class SWIMS_FOV(CS_FOV):
                          rot_deg=self.rot_deg),
             self.dc.Line(x, y - yr, x, y + yr,
                          color=self.swims_color, linewidth=2))
-        self.canvas.add(self.swims_box)
+        self.add_object(self.swims_box)
 
     def set_scale(self, scale_x, scale_y):
         super().set_scale(scale_x, scale_y)
@@ -352,27 +313,18 @@ class SWIMS_FOV(CS_FOV):
         super().set_pos(pt)
         x, y = pt
         xr, yr = self.swims_radius
-        self.swims_box.objects[0].x = x
-        self.swims_box.objects[0].y = y
+        self.swims_box.objects[0].points[0] = (x, y)
         self.swims_box.objects[0].xradius = xr
         self.swims_box.objects[0].yradius = yr
-        self.swims_box.objects[1].x = x - xr
-        self.swims_box.objects[1].y = y + yr
-        self.swims_box.objects[2].y1 = y - yr
-        self.swims_box.objects[2].y2 = y + yr
-        self.swims_box.objects[2].x1 = x
-        self.swims_box.objects[2].x2 = x
+        self.swims_box.objects[1].points[0] = (x - xr, y + yr)
+        self.swims_box.objects[2].points[:] = ((x, y - yr),
+                                               (x, y + yr))
 
         self.canvas.update_canvas()
 
     def rotate(self, rot_deg):
         super().rotate(rot_deg)
 
-    def remove(self):
-        super().remove()
-
-        self.canvas.delete_object(self.swims_box)
-
 
 class FOCAS_FOV(CS_FOV):
     def __init__(self, canvas, pt):
@@ -385,7 +337,7 @@ class FOCAS_FOV(CS_FOV):
         self.focas_info = self.dc.CompoundObject(
             self.dc.Line(x - xr, y, x + xr, y,
                          color=self.cs_color, linewidth=2))
-        self.canvas.add(self.focas_info)
+        self.add_object(self.focas_info)
 
     def set_scale(self, scale_x, scale_y):
         super().set_scale(scale_x, scale_y)
@@ -397,18 +349,11 @@ class FOCAS_FOV(CS_FOV):
         super().set_pos(pt)
         x, y = pt
         xr = self.cs_radius
-        self.focas_info.objects[0].x1 = x - xr
-        self.focas_info.objects[0].x2 = x + xr
-        self.focas_info.objects[0].y1 = y
-        self.focas_info.objects[0].y2 = y
+        self.focas_info.objects[0].points[:] = ((x - xr, y),
+                                                (x + xr, y))
 
         self.canvas.update_canvas()
 
-    def remove(self):
-        super().remove()
-
-        self.canvas.delete_object(self.focas_info)
-
 
 class HDS_FOV(FOV):
     def __init__(self, canvas, pt):
@@ -434,11 +379,11 @@ class HDS_FOV(FOV):
                          rot_deg=self.rot_deg),
             self.dc.Line(x, y - r, x, y + r,
                          color=self.hds_color, linewidth=2))
-        self.canvas.add(self.hds_circ)
+        self.add_object(self.hds_circ)
 
     def set_scale(self, scale_x, scale_y):
         # NOTE: sign of scale val indicates orientation
-        self.scale = np.mean((abs(scale_x), abs(scale_y)))
+        self.scale = 0.5 * (abs(scale_x) + abs(scale_y))
 
         self.hds_radius = self.hds_fov * 0.5 / self.scale
         pt = self.hds_circ.objects[0].points[0][:2]
@@ -448,43 +393,52 @@ class HDS_FOV(FOV):
         super().set_pos(pt)
         x, y = pt
         r = self.hds_radius
-        self.hds_circ.objects[0].x = x
-        self.hds_circ.objects[0].y = y
+        self.update_labels(r)
+        self.hds_circ.objects[0].points[0] = (x, y)
         self.hds_circ.objects[0].radius = r
-        self.hds_circ.objects[1].x = x
-        self.hds_circ.objects[1].y = y + r
-        self.hds_circ.objects[2].x1 = x
-        self.hds_circ.objects[2].x2 = x
-        self.hds_circ.objects[2].y1 = y - r
-        self.hds_circ.objects[2].y2 = y + r
+        self.hds_circ.objects[1].points[0] = (x, y + r)
+        self.hds_circ.objects[2].points[:] = ((x, y - r),
+                                              (x, y + r))
 
         self.canvas.update_canvas()
 
     def rotate(self, rot_deg):
         self.rot_deg = rot_deg
 
-    def remove(self):
-        self.canvas.delete_object(self.hds_circ)
+
+def calc_pa_hds_noimr(dec_deg, ha_hr, lat_deg):
+    """Calculate the position angle seen by HDS when it is used without
+    the image rotator.
+
+    All inputs are scalars; the trig is done with the `math` module, which
+    is much faster than numpy for single values.
+    """
+    lat_rad = math.radians(lat_deg)
+    dec_rad = math.radians(dec_deg)
+    ha_rad = math.radians(ha_hr * 15.0)
+    hds_pa_offset = -58.4
+
+    sin_lat, cos_lat = math.sin(lat_rad), math.cos(lat_rad)
+    sin_dec, cos_dec = math.sin(dec_rad), math.cos(dec_rad)
+    sin_ha, cos_ha = math.sin(ha_rad), math.cos(ha_rad)
+
+    p_deg = math.degrees(math.atan2(math.tan(lat_rad) * cos_dec -
+                                    sin_dec * cos_ha, sin_ha))
+    # guard against round off pushing the argument slightly outside [-1, 1]
+    cos_z = sin_lat * sin_dec + cos_lat * cos_dec * cos_ha
+    z_deg = math.degrees(math.acos(max(-1.0, min(1.0, cos_z))))
+    hds_pa_deg = -(p_deg - z_deg) + hds_pa_offset
+    # wrap to [-180, 180)
+    return (hds_pa_deg + 180.0) % 360.0 - 180.0
 
 
 class HDS_FOV_no_IMR(HDS_FOV):
     def __init__(self, canvas, pt):
         super().__init__(canvas, pt)
 
+    @staticmethod
     def calc_pa_noimr(dec_deg, ha_hr, lat_deg):
-        lat_rad = np.radians(lat_deg)
-        dec_rad = np.radians(dec_deg)
-        ha_rad = np.radians(ha_hr * 15.0)
-        hds_pa_offset = -58.4
-
-        p_deg = np.degrees(np.arctan2((np.tan(lat_rad) * np.cos(dec_rad) -
-                                       np.sin(dec_rad) * np.cos(ha_rad)),
-                                      np.sin(ha_rad)))
-        z_deg = np.degrees(np.arccos(np.sin(lat_rad) * np.sin(dec_rad) +
-                                     np.cos(lat_rad) * np.cos(dec_rad) *
-                                     np.cos(ha_rad)))
-        hds_pa_ang = Angle((-(p_deg - z_deg) + hds_pa_offset) * u.deg)
-        return hds_pa_ang.wrap_at(180 * u.deg).value
+        return calc_pa_hds_noimr(dec_deg, ha_hr, lat_deg)
 
 
 class PF_FOV(FOV):
@@ -508,11 +462,11 @@ class PF_FOV(FOV):
                          text="PF FOV (1.5 deg)",
                          color=self.pf_color,
                          rot_deg=self.rot_deg))
-        self.canvas.add(self.pf_circ)
+        self.add_object(self.pf_circ)
 
     def set_scale(self, scale_x, scale_y):
         # NOTE: sign of scale val indicates orientation
-        self.scale = np.mean((abs(scale_x), abs(scale_y)))
+        self.scale = 0.5 * (abs(scale_x) + abs(scale_y))
 
         self.pf_radius = self.pf_fov * 0.5 / self.scale
         pt = self.pf_circ.objects[0].points[0][:2]
@@ -522,20 +476,16 @@ class PF_FOV(FOV):
         super().set_pos(pt)
         x, y = pt
         r = self.pf_radius
-        self.pf_circ.objects[0].x = x
-        self.pf_circ.objects[0].y = y
+        self.update_labels(r)
+        self.pf_circ.objects[0].points[0] = (x, y)
         self.pf_circ.objects[0].radius = r
-        self.pf_circ.objects[1].x = x
-        self.pf_circ.objects[1].y = y + r
+        self.pf_circ.objects[1].points[0] = (x, y + r)
 
         self.canvas.update_canvas()
 
     def rotate(self, rot_deg):
         self.rot_deg = rot_deg
 
-    def remove(self):
-        self.canvas.delete_object(self.pf_circ)
-
 
 class HSC_FOV(PF_FOV):
     pass
@@ -546,9 +496,11 @@ class PFS_FOV(PF_FOV):
 
 
 # see spot/instruments/__init__.py
-#
-subaru_fov_dict = dict(AO188=AO188_FOV, IRCS=IRCS_FOV, IRD=IRD_FOV,
-                       #COMICS=COMICS_FOV, SWIMS=SWIMS_FOV,
-                       MOIRCS=MOIRCS_FOV, FOCAS=FOCAS_FOV,
-                       HDS=HDS_FOV, HDS_NO_IMR=HDS_FOV_no_IMR,
-                       HSC=HSC_FOV, PFS=PFS_FOV)
+# NOTE: read-only, so that users of inst_dict cannot alter it by accident
+subaru_fov_dict = MappingProxyType(dict(AO188=AO188_FOV, IRCS=IRCS_FOV,
+                                        IRD=IRD_FOV,
+                                        #COMICS=COMICS_FOV, SWIMS=SWIMS_FOV,
+                                        MOIRCS=MOIRCS_FOV, FOCAS=FOCAS_FOV,
+                                        HDS=HDS_FOV,
+                                        HDS_NO_IMR=HDS_FOV_no_IMR,
+                                        HSC=HSC_FOV, PFS=PFS_FOV))
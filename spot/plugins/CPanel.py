@@ -190,16 +190,17 @@ class CPanel(GingaPlugin.GlobalPlugin):
         self.fv.init_workspace(ws)
 
         path = os.path.join(ginga_home, wsname + '.json')
-        if os.path.exists(path):
-            # if a saved configuration for this workspace exists, load it
-            # so that windows will be created in the appropriate places
+        # if a saved configuration for this workspace exists, load it
+        # so that windows will be created in the appropriate places
+        try:
             with open(path, 'r') as in_f:
-                try:
-                    cfg_d = json.loads(in_f.read())
-                    ws.child_catalog = cfg_d['tabs']
-                except Exception as e:
-                    self.logger.error("Error reading workspace '{path}': {e}",
-                                      exc_info=True)
+                cfg_d = json.load(in_f)
+            ws.child_catalog = cfg_d['tabs']
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            self.logger.error(f"Error reading workspace '{path}': {e}",
+                              exc_info=True)
 
         cb_dct = dict()
 
@@ -309,12 +310,21 @@ class CPanel(GingaPlugin.GlobalPlugin):
         ws = self.fv.ds.get_ws(wsname)
         cfg_d = ws.get_configuration()
         path = os.path.join(ginga_home, wsname + '.json')
+        # write to a temp file and swap it in, so that a failure part way
+        # through does not leave a truncated layout file behind
+        tmp_path = path + '.tmp'
         try:
-            with open(path, 'w') as out_f:
-                out_f.write(json.dumps(cfg_d, indent=4))
+            with open(tmp_path, 'w') as out_f:
+                json.dump(cfg_d, out_f, indent=4)
+            os.replace(tmp_path, path)
             self.fv.show_status(f"Workspace positions saved for {wsname}")
 
         except Exception as e:
+            if os.path.exists(tmp_path):
+                try:
+                    os.remove(tmp_path)
+                except OSError:
+                    pass
             errmsg = f"Error saving workspace {wsname}: {e}"
             self.logger.error(errmsg)
             self.fv.show_error(errmsg)
@@ -10,21 +10,28 @@ naojsoft packages
 -----------------
 - ginga
 """
-import numpy as np
-import datetime
+import os
+import math
+import time
 import re
+import tempfile
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
+import requests
+from requests.adapters import HTTPAdapter, Retry
 from astropy import units as u
 from astropy.coordinates import SkyCoord
-from astroquery.skyview import SkyView
+# NOTE: astroquery.skyview and astropy.table are imported lazily, where
+# they are used, so that they are only loaded if those services are used
 #from astroquery.sdss import SDSS
-from astropy.table import Table
+from astropy.utils.data import (download_file, is_url_in_cache,
+                                import_file_to_cache)
 
 # ginga
 from ginga.gw import Widgets, GwHelp
 from ginga import GingaPlugin
-from ginga.util import wcs, catalog, dp
-from ginga.AstroImage import AstroImage
+from ginga.util import wcs, catalog, dp, loader
 
 from spot.util.target import normalize_ra_dec_equinox
 
@@ -71,6 +78,13 @@ image_sources = {
     #'SDSS: 17': dict(),
 }
 
+# digits of an equinox string, e.g. 'J2000' -> '2000'
+_equinox_re = re.compile(r'\d+')
+
+# (service, survey) for each image source
+source_info = {name: tuple(part.strip() for part in name.split(':'))
+               for name in image_sources}
+
 service_urls = {
     'ESO': """https://archive.eso.org/dss/dss?ra={ra}&dec={dec}&mime-type=application/x-fits&x={arcmin}&y={arcmin}&Sky-Survey={survey}&equinox={equinox}""",
     'STScI': """https://archive.stsci.edu/cgi-bin/dss_search?v={survey}&r={ra_deg}&d={dec_deg}&e={equinox}&h={arcmin}&w={arcmin}&f=fits&c=none&fov=NONE&v3=""",
@@ -83,6 +97,35 @@ service_urls = {
 # 'SDSS-DR7': """https://skyservice.pha.jhu.edu/DR7/ImgCutout/getjpeg.aspx?ra={ra_deg}&dec={dec_deg}&scale=0.39612%20%20%20&width={size}&height={size}"""
 
 
+# shared HTTP session, so that repeated queries to the same image service
+# reuse connections (and retry transient server errors)
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(max_retries=Retry(
+    total=3, backoff_factor=0.5, status_forcelist=(502, 503, 504))))
+
+# sexagesimal formatting of coordinates; memoized since the same
+# positions (e.g. a tracking telescope) get formatted over and over
+ra_deg_to_str = lru_cache(maxsize=256)(wcs.ra_deg_to_str)
+dec_deg_to_str = lru_cache(maxsize=256)(wcs.dec_deg_to_str)
+
+
+@lru_cache(maxsize=256)
+def _ps1_table(ra_deg, dec_deg, filters):
+    """Look up the PanSTARRS-1 image files covering a position.
+
+    Results are cached, since the same target is often requested more
+    than once (e.g. to try a different filter or size).
+    """
+    from astropy.table import Table
+
+    service = "https://ps1images.stsci.edu/cgi-bin/ps1filenames.py"
+    url = f"{service}?ra={ra_deg}&dec={dec_deg}&filters={filters}"
+    # Read the ASCII table returned by the url
+    r = _session.get(url, timeout=60)
+    r.raise_for_status()
+    return Table.read(r.text, format='ascii')
+
+
 class FindImage(GingaPlugin.LocalPlugin):
     """
     FindImage
@@ -137,6 +180,7 @@ class FindImage(GingaPlugin.LocalPlugin):
                                    sky_radius_arcmin=3,
                                    follow_telescope=False,
                                    telescope_update_interval=3.0,
+                                   download_timeout=120.0,
                                    color_map='ds9_cool')
         self.settings.load(onError='silent')
 
@@ -182,6 +226,9 @@ class FindImage(GingaPlugin.LocalPlugin):
         self.targets = None
         self.tmr = GwHelp.Timer(duration=self.settings['telescope_update_interval'])
         self.tmr.add_callback('expired', self.update_tel_timer_cb)
+        # incremented for each download request; results from older
+        # requests that finish late are discarded
+        self._download_gen = 0
         self.gui_up = False
 
     def build_gui(self, container):
@@ -316,7 +363,7 @@ class FindImage(GingaPlugin.LocalPlugin):
         self.size = (val, val)
 
     def change_skyradius_cb(self, setting, radius_arcmin):
-        radius = int(np.ceil(radius_arcmin) * 1.5)
+        radius = int(math.ceil(radius_arcmin) * 1.5)
         self.size = (radius, radius)
         if self.gui_up:
             self.w.size.set_value(radius)
@@ -326,54 +373,54 @@ class FindImage(GingaPlugin.LocalPlugin):
             self.fv.assert_gui_thread()
             ra_deg, dec_deg = self.get_radec()
             equinox_str = self.w.equinox.get_text().strip()
-            equinox = re.findall('[0-9]+', equinox_str)
-            if not equinox:
+            match = _equinox_re.search(equinox_str)
+            if match is None:
                 equinox = 2000
             else:
-                equinox = int(equinox[0])
+                equinox = int(match.group(0))
 
             # initiate the download
             i_source = self.w.image_source.get_text().strip()
-            service_name, survey = i_source.split(":")
-            survey = survey.strip()
+            service_name, survey = source_info[i_source]
 
             arcmin = self.w.size.get_value()
 
-            image_timestamp = datetime.datetime.now()
-            image_info_text = "Initiating image download at: " + \
-                image_timestamp.strftime("%D %H:%M:%S")
-            self.w.select_image_info.set_text(image_info_text)
+            self.set_info_text("Initiating image download")
 
-            self.fv.nongui_do(self.download_image, ra_deg, dec_deg,
-                              equinox, service_name, survey, arcmin)
+            self._download_gen += 1
+            self.fv.nongui_do(self.download_image, self._download_gen,
+                              ra_deg, dec_deg, equinox, service_name,
+                              survey, arcmin)
 
         except Exception as e:
-            image_timestamp = datetime.datetime.now()
-            image_info_text = "Image download failed at: " + \
-                image_timestamp.strftime("%D %H:%M:%S")
-            self.w.select_image_info.set_text(image_info_text)
+            self.set_info_text("Image download failed")
             errmsg = f"failed to find image: {e}"
             self.logger.error(errmsg, exc_info=True)
             self.fv.show_error(errmsg)
 
-    def download_image(self, ra_deg, dec_deg, equinox, service_name,
+    def download_image(self, gen, ra_deg, dec_deg, equinox, service_name,
                        survey, arcmin):
         try:
             self.fv.assert_nongui_thread()
 
-            self.do_download_image(ra_deg, dec_deg, equinox, service_name,
-                                   survey, arcmin)
+            image = self.do_download_image(ra_deg, dec_deg, equinox,
+                                           service_name, survey, arcmin)
 
-            image_timestamp = datetime.datetime.now()
-            image_info_text = "Image download complete, displayed at: " + \
-                image_timestamp.strftime("%D %H:%M:%S")
-            self.fv.gui_do(self.w.select_image_info.set_text, image_info_text)
+            if gen != self._download_gen:
+                # user has asked for another image in the meantime
+                self.logger.info("discarding image from superseded request")
+                return
+
+            self.fv.gui_do(self.channel.add_image, image)
+            self.fv.gui_do(self.set_info_text,
+                           "Image download complete, displayed")
 
         except Exception as e:
-            image_timestamp = datetime.datetime.now()
-            image_info_text = "Image download failed at: " + \
-                image_timestamp.strftime("%D %H:%M:%S")
-            self.fv.gui_do(self.w.select_image_info.set_text, image_info_text)
+            if gen != self._download_gen:
+                self.logger.info(f"superseded image request failed: {e}")
+                return
+            self.fv.gui_do(self.set_info_text,
+                           "Image download failed")
             errmsg = f"failed to find image: {e}"
             self.logger.error(errmsg, exc_info=True)
             self.fv.gui_do(self.fv.show_error, errmsg)
@@ -388,18 +435,23 @@ class FindImage(GingaPlugin.LocalPlugin):
         service_name = service_name.strip()
         # service_url = service_urls[service_name]
 
-        img = AstroImage(logger=self.logger)
+        # NOTE: images from the download cache all have the same file
+        # name, so give each one a name describing what it is
+        name = f"{service_name}_{survey}_{ra_deg:.5f}_{dec_deg:+.5f}_{arcmin}"
+        name = name.replace(' ', '_')
 
         self.logger.info(f'service_name={service_name}')
 
         service = service_name.upper()
         if service == "SKYVIEW":
             self.logger.info(f'service name={service_name}')
+            from astroquery.skyview import SkyView
 
-            sv = SkyView()
+            # NOTE: use the astroquery singleton, which keeps its HTTP
+            # session between queries; calling SkyView() makes a new one
+            sv = SkyView
 
             position = SkyCoord(ra=ra_deg * u.degree, dec=dec_deg * u.degree)
-            radius = u.Quantity(arcmin, unit=u.arcmin)
 
             self.logger.info(f'position={position}, survey={survey}, radius={radius}')
 
@@ -409,8 +461,9 @@ class FindImage(GingaPlugin.LocalPlugin):
             self.logger.debug(f'im_lst={im_lst}')
             service_url = list(im_lst)[0]
             self.logger.debug(f'SkyView url={service_url}')
-            self.fv.gui_do(self.fv.open_uris, [service_url],
-                           chname=self.channel.name)
+            # NOTE: SkyView makes a new URL for every request, so
+            # caching it would only fill up the download cache
+            return self.load_url(service_url, name, cache=False)
 
         # elif service == "SDSS":
         #     position = SkyCoord(ra=ra_deg * u.degree, dec=dec_deg * u.degree)
@@ -441,10 +494,9 @@ class FindImage(GingaPlugin.LocalPlugin):
                       }
 
             service_url = service_urls[service_name]
-            service_url = service_url.format(**params)
+            service_url = service_url.format_map(params)
             self.logger.debug(f'ESO url={service_url}')
-            self.fv.gui_do(self.fv.open_uris, [service_url],
-                           chname=self.channel.name)
+            return self.load_url(service_url, name)
 
         elif service == "PANSTARRS-1":
             self.logger.debug('Panstarrs 1...')
@@ -453,12 +505,9 @@ class FindImage(GingaPlugin.LocalPlugin):
             self.logger.debug(f'Panstarrs1 ra={ra_deg}, dec={dec_deg}, filter={panstarrs_filter}')
 
             def get_image_table(ra, dec, filters):
-                service = "https://ps1images.stsci.edu/cgi-bin/ps1filenames.py"
-                url = f"{service}?ra={ra_deg}&dec={dec_deg}&filters={filters}"
-                self.logger.debug(f'table url={url}')
-                # Read the ASCII table returned by the url
-                table = Table.read(url, format='ascii')
-                return table
+                # NOTE: positions are rounded (to ~0.4 arcsec) so that the
+                # cache hits for repeated lookups of the same target
+                return _ps1_table(round(ra, 4), round(dec, 4), filters)
 
             def get_imurl(ra, dec):
 
@@ -474,6 +523,9 @@ class FindImage(GingaPlugin.LocalPlugin):
 
                 table = get_image_table(ra, dec, filters)
                 self.logger.debug(f'table={table}')
+                if len(table) == 0:
+                    # fail before asking for a cutout that cannot exist
+                    raise ValueError(f"no PanSTARRS-1 images in filter(s) '{filters}' at this position")
 
                 if panstarrs_filter == 'color':
                     if len(table) < 3:
@@ -481,16 +533,18 @@ class FindImage(GingaPlugin.LocalPlugin):
                     # If more than 3 filters, pick 3 filters from the availble results
 
                     params = {'ra': ra, 'dec': dec, 'size': size, 'format': 'jpg'}
-                    service_url = service_url.format(**params)
+                    service_url = service_url.format_map(params)
 
                     if len(table) > 3:
                         table = table[[0, len(table) // 2, len(table) - 1]]
                         # Create the red, green, and blue files for our image
-                    for i, param in enumerate(["red", "green", "blue"]):
-                        service_url = service_url + f"&{param}={table['filename'][i]}"
+                    service_url = '&'.join(
+                        [service_url] +
+                        [f"{param}={table['filename'][i]}"
+                         for i, param in enumerate(["red", "green", "blue"])])
                 else:
                     params = {'ra': ra, 'dec': dec, 'size': size, 'format': 'fits'}
-                    service_url = service_url.format(**params)
+                    service_url = service_url.format_map(params)
                     service_url = service_url + "&red=" + table[0]['filename']
 
                 self.logger.debug(f'service_url={service_url}')
@@ -499,8 +553,7 @@ class FindImage(GingaPlugin.LocalPlugin):
             service_url = get_imurl(ra_deg, dec_deg)
 
             self.logger.debug(f'Panstarrs1 url={service_url}')
-            self.fv.gui_do(self.fv.open_uris, [service_url],
-                           chname=self.channel.name)
+            return self.load_url(service_url, name)
 
         elif service == "STSCI":
             self.logger.debug('STScI...')
@@ -518,10 +571,82 @@ class FindImage(GingaPlugin.LocalPlugin):
                       }
 
             service_url = service_urls[service_name]
-            service_url = service_url.format(**params)
+            service_url = service_url.format_map(params)
             self.logger.debug(f'STScI url={service_url}')
-            self.fv.gui_do(self.fv.open_uris, [service_url],
-                           chname=self.channel.name)
+            return self.load_url(service_url, name)
+
+        raise ValueError(f"unknown image service '{service_name}'")
+
+    def download_images(self, positions, service_name, survey, arcmin,
+                        equinox=2000, max_workers=4):
+        """Download images for several positions at once.
+
+        `positions` is a sequence of (ra_deg, dec_deg) tuples.  The queries
+        are run concurrently and the loaded images are returned in the
+        same order as `positions` (they are not displayed).
+        """
+        def _download(pos):
+            ra_deg, dec_deg = pos
+            return self.do_download_image(ra_deg, dec_deg, equinox,
+                                          service_name, survey, arcmin)
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(_download, positions))
+
+    def load_url(self, url, name, cache=True):
+        """Download an image and load it.
+
+        Images are fetched with the shared HTTP session.  If `cache` is
+        True, the download is kept in the astropy download cache, so asking
+        again for the same image does not fetch it from the service again.
+        Otherwise the downloaded file is removed once the image is loaded.
+        """
+        self.fv.assert_nongui_thread()
+        if cache and is_url_in_cache(url):
+            self.logger.debug(f'loading {url} from the download cache')
+            # NOTE: for a cached url this just returns the cached file
+            path = download_file(url, cache=True, show_progress=False)
+            image = loader.load_data(path, logger=self.logger)
+            image.set(name=name)
+            return image
+
+        self.logger.debug(f'downloading {url}')
+        path = self.fetch_url(url)
+        try:
+            image = loader.load_data(path, logger=self.logger)
+            if cache:
+                # only keep responses we can use (e.g. not an error page)
+                import_file_to_cache(url, path, remove_original=True)
+        finally:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+        image.set(name=name)
+        return image
+
+    def fetch_url(self, url):
+        """Download `url` with the shared HTTP session to a temporary
+        file and return its path.
+        """
+        timeout = self.settings.get('download_timeout')
+        with _session.get(url, timeout=timeout, stream=True) as r:
+            r.raise_for_status()
+            with tempfile.NamedTemporaryFile(delete=False) as out_f:
+                try:
+                    for chunk in r.iter_content(chunk_size=65536):
+                        out_f.write(chunk)
+                except Exception:
+                    out_f.close()
+                    os.remove(out_f.name)
+                    raise
+        return out_f.name
+
+    def set_info_text(self, msg):
+        """Show a time stamped message in the download info area."""
+        self.w.select_image_info.set_text(
+            f"{msg} at: {time.strftime('%D %H:%M:%S')}")
 
     def create_blank_image(self):
         self.fitsimage.onscreen_message("Creating blank field...",
@@ -542,16 +667,13 @@ class FindImage(GingaPlugin.LocalPlugin):
         self.fitsimage.set_image(image)
 
     def label_image(self):
-        image_timestamp = datetime.datetime.now()
-        image_info_text = "Image download complete, displayed at: " + \
-            image_timestamp.strftime("%D %H:%M:%S")
-        self.w.select_image_info.set_text(image_info_text)
+        self.set_info_text("Image download complete, displayed")
 
         # TODO: add image source
         ra_deg, dec_deg = self.get_radec()
         name = self.w.tgt_name.get_text()
 
-        ra_sgm, dec_sgm = wcs.ra_deg_to_str(ra_deg), wcs.dec_deg_to_str(dec_deg)
+        ra_sgm, dec_sgm = ra_deg_to_str(ra_deg), dec_deg_to_str(dec_deg)
         lbl = f"{name} (RA: {ra_sgm} / DEC: {dec_sgm})"
         self.lbl_obj.text = lbl
         self.fitsimage.redraw(whence=3)
@@ -572,7 +694,7 @@ class FindImage(GingaPlugin.LocalPlugin):
         return (ra_deg, dec_deg)
 
     def get_radec_list(self, ra_deg, dec_deg):
-        ra_sgm, dec_sgm = wcs.ra_deg_to_str(ra_deg), wcs.dec_deg_to_str(dec_deg)
+        ra_sgm, dec_sgm = ra_deg_to_str(ra_deg), dec_deg_to_str(dec_deg)
         ra_list, dec_list = ra_sgm.split(':'), dec_sgm.split(':')
         return (ra_list, dec_list)
 
@@ -581,9 +703,14 @@ class FindImage(GingaPlugin.LocalPlugin):
         if self.w.follow_telescope.get_state():
             if not self.w.lock_target.get_state():
                 try:
-                    self.w.ra.set_text(wcs.ra_deg_to_str(status.ra_deg))
-                    self.w.dec.set_text(wcs.dec_deg_to_str(status.dec_deg))
-                    self.w.equinox.set_text(str(status.equinox))
+                    texts = ((self.w.ra, ra_deg_to_str(status.ra_deg)),
+                             (self.w.dec, dec_deg_to_str(status.dec_deg)),
+                             (self.w.equinox, str(status.equinox)))
+                    # only update widgets whose text differs, i.e. the
+                    # telescope has moved or the user has edited them
+                    for w, text in texts:
+                        if w.get_text() != text:
+                            w.set_text(text)
 
                 except Exception as e:
                     self.logger.error(f"error updating info: {e}", exc_info=True)
@@ -593,7 +720,10 @@ class FindImage(GingaPlugin.LocalPlugin):
                 image = self.viewer.get_image()
                 if image is not None:
                     x, y = image.radectopix(status.ra_deg, status.dec_deg)
-                    self.viewer.set_pan(x, y)
+                    pan_x, pan_y = self.viewer.get_pan()[:2]
+                    # skip sub-pixel moves, which would redraw for nothing
+                    if abs(x - pan_x) + abs(y - pan_y) >= 0.5:
+                        self.viewer.set_pan(x, y)
 
             except Exception as e:
                 self.logger.error(f"Could not set pan position: {e}",
@@ -618,8 +748,8 @@ class FindImage(GingaPlugin.LocalPlugin):
             self.fv.show_error("Please select exactly one target in the Targets table!")
             return
         tgt = list(selected)[0]
-        self.w.ra.set_text(wcs.ra_deg_to_str(tgt.ra))
-        self.w.dec.set_text(wcs.dec_deg_to_str(tgt.dec))
+        self.w.ra.set_text(ra_deg_to_str(tgt.ra))
+        self.w.dec.set_text(dec_deg_to_str(tgt.dec))
         self.w.equinox.set_text(str(tgt.equinox))
         self.w.tgt_name.set_text(tgt.name)
 
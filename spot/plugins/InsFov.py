@@ -8,16 +8,22 @@ naojsoft packages
 -----------------
 - ginga
 """
+import math
+import time
+from collections import OrderedDict
+from functools import lru_cache
+
 import numpy as np
 
 # ginga
-from ginga.gw import Widgets
-from ginga import GingaPlugin, trcalc
+from ginga.gw import Widgets, GwHelp
+from ginga import GingaPlugin
 from ginga.util import wcs
 from ginga.canvas.coordmap import BaseMapper
 
 # get all overlays
 from spot.instruments import inst_dict
+from spot.util.rot import normalize_angle
 
 
 class InsFov(GingaPlugin.LocalPlugin):
@@ -70,7 +76,9 @@ class InsFov(GingaPlugin.LocalPlugin):
         # get FOV preferences
         prefs = self.fv.get_preferences()
         self.settings = prefs.create_category('plugin_InsFov')
-        self.settings.add_defaults(sky_radius_arcmin=3)
+        self.settings.add_defaults(sky_radius_arcmin=3,
+                                   pan_update_interval=0.1,
+                                   fov_cache_size=4)
         self.settings.load(onError='silent')
 
         self.viewer = self.fitsimage
@@ -85,12 +93,29 @@ class InsFov(GingaPlugin.LocalPlugin):
         self.canvas = canvas
 
         self.cur_fov = None
+        # overlays already built, keyed by (telname, insname),
+        # most recently used last
+        self.fov_cache = OrderedDict()
+        # pan position and scale the overlay was last placed at
+        self._last_pos = None
+        # WCS scale and compass angles, keyed by (image id, pan position)
+        self._wcs_cache = dict()
+        # inputs and viewer orientation of the last completed redo_image()
+        self._redo_sig = None
         self.xflip = False
         self.rot_deg = 0.0
         self.mount_offset_rot_deg = 0.0
         # user's chosen flip and PA
         self.flip = False
         self.pa_deg = 0.0
+        # limits how often the pointing widgets are updated while the
+        # user pans or rotates the image
+        self.info_tmr = GwHelp.Timer(duration=self.settings['pan_update_interval'])
+        self.info_tmr.add_callback('expired', lambda tmr: self.update_info())
+        self._info_time = 0.0
+        # (image id, pan position) the RA/DEC widgets were last set for
+        self._radec_pos = None
+        self._insmenu_populated = False
         self.gui_up = False
 
     def build_gui(self, container):
@@ -115,19 +140,13 @@ class InsFov(GingaPlugin.LocalPlugin):
         fr.set_widget(w)
         top.add_widget(fr, stretch=0)
 
-        # populate instrument overlays menu
+        # instrument overlays menu is populated on first use
         self.w.insmenu = Widgets.Menu()
         child = self.w.insmenu.add_name('None')
         child.add_callback('activated', self.select_inst_cb, 'None', 'None')
-        for telname, fov_dct in inst_dict.items():
-            menu = self.w.insmenu.add_menu(telname)
-            for insname in fov_dct:
-                child = menu.add_name(insname)
-                child.add_callback('activated', self.select_inst_cb,
-                                   telname, insname)
+        self._insmenu_populated = False
         b.instrument.set_text('None')
-        b.choose.add_callback('activated',
-                              lambda w: self.w.insmenu.popup(widget=w))
+        b.choose.add_callback('activated', self.popup_inst_menu_cb)
         b.choose.set_tooltip("Choose instrument overlay")
 
         b.pa.set_text("0.00")
@@ -168,6 +187,17 @@ class InsFov(GingaPlugin.LocalPlugin):
         container.add_widget(top, stretch=1)
         self.gui_up = True
 
+    def popup_inst_menu_cb(self, w):
+        if not self._insmenu_populated:
+            for telname, fov_dct in inst_dict.items():
+                menu = self.w.insmenu.add_menu(telname)
+                for insname in fov_dct:
+                    child = menu.add_name(insname)
+                    child.add_callback('activated', self.select_inst_cb,
+                                       telname, insname)
+            self._insmenu_populated = True
+        self.w.insmenu.popup(widget=w)
+
     def close(self):
         self.fv.stop_local_plugin(self.chname, str(self))
         return True
@@ -186,6 +216,8 @@ class InsFov(GingaPlugin.LocalPlugin):
         self.redo()
 
     def stop(self):
+        self.info_tmr.stop()
+        self._redo_sig = None
         self.gui_up = False
         # remove the canvas from the image
         p_canvas = self.viewer.get_canvas()
@@ -195,36 +227,61 @@ class InsFov(GingaPlugin.LocalPlugin):
         """This is called when a new image arrives or the data in the
         existing image changes.
         """
+        # WCS may differ, so cached angles can no longer be trusted
+        self._wcs_cache.clear()
+        self._radec_pos = None
+        self._redo_sig = None
+        self.redo_image()
+
+    def redo_image(self):
+        """Orient the image and place the FOV for the current flip and PA."""
         if not self.gui_up:
             return
         image = self.viewer.get_image()
         if image is None:
             return
-        header = image.get_header()
-        rot, scale = wcs.get_xy_rotation_and_scale(header)
-        scale_x, scale_y = scale
+        # nothing to do if neither the inputs nor the viewer orientation
+        # have changed since the last time
+        data_x, data_y = self.viewer.get_pan(coord='data')[:2]
+        sig = (id(image), data_x, data_y, self.pa_deg, self.flip,
+               self.cur_fov, self.mount_offset_rot_deg,
+               self.viewer.get_transforms(), self.viewer.get_rotation())
+        if sig == self._redo_sig:
+            return
+        self._last_pos = None
+        scale_x, scale_y, degn, dege = self.get_wcs_info(image, data_x, data_y)
 
         # rot_x, rot_y = rot
         # # the image rotation necessary to show 0 deg position angle
         # self.rot_deg = np.mean((rot_x, rot_y))
-        xflip, rot_deg = self.calc_ang(image, righthand=self.flip)
+        xflip, rot_deg = self.calc_ang(degn, dege, righthand=self.flip)
         self.xflip = xflip
         self.rot_deg = rot_deg
 
-        if self.flip:
-            img_rot_deg = self.rot_deg - self.mount_offset_rot_deg + self.pa_deg
-        else:
-            img_rot_deg = self.rot_deg + self.mount_offset_rot_deg - self.pa_deg
-        # adjust image flip and rotation for desired position angle
-        self.viewer.transform(xflip, False, False)
-        self.viewer.rotate(img_rot_deg)
+        # the sense of the PA is reversed when flipped
+        sign = -1.0 if self.flip else 1.0
+        img_rot_deg = self.rot_deg + sign * (self.mount_offset_rot_deg - self.pa_deg)
+        # NOTE: FOV set_scale/set_pos chains update the canvas at each
+        # level; suppressing redraws here collapses them into one
+        with self.viewer.suppress_redraw:
+            # adjust image flip and rotation for desired position angle;
+            # each of these triggers a full redraw, so skip if already set
+            if self.viewer.get_transforms() != (xflip, False, False):
+                self.viewer.transform(xflip, False, False)
+            if self.viewer.get_rotation() != img_rot_deg:
+                self.viewer.rotate(img_rot_deg)
 
-        if self.cur_fov is not None:
-            self.cur_fov.set_scale(scale_x, scale_y)
+            if self.cur_fov is not None:
+                self.cur_fov.set_scale(scale_x, scale_y)
+
+                self.viewer.redraw(whence=3)
 
-            self.viewer.redraw(whence=3)
+        self._redo_sig = (sig[:-2] + (self.viewer.get_transforms(),
+                                      self.viewer.get_rotation()))
 
     def select_inst_cb(self, w, telname, insname):
+        self._last_pos = None
+        self._redo_sig = None
         with self.viewer.suppress_redraw:
             # changing instrument: remove old FOV
             if self.cur_fov is not None:
@@ -236,66 +293,140 @@ class InsFov(GingaPlugin.LocalPlugin):
                 self.mount_offset_rot_deg = 0.0
                 self.w.instrument.set_text(telname)
             else:
-                klass = inst_dict[telname][insname]
                 pt = self.viewer.get_pan(coord='data')
-                self.cur_fov = klass(self.canvas, pt[:2])
+                key = (telname, insname)
+                if key in self.fov_cache and self.fov_cache[key].objs:
+                    # reuse the overlay built the last time this
+                    # instrument was selected (only overlays that
+                    # registered their objects with add_object() can
+                    # be restored)
+                    self.cur_fov = self.fov_cache[key]
+                    self.fov_cache.move_to_end(key)
+                    self.cur_fov.restore()
+                    self.cur_fov.set_pos(pt[:2])
+                else:
+                    klass = inst_dict[telname][insname]
+                    self.cur_fov = klass(self.canvas, pt[:2])
+                    self.fov_cache[key] = self.cur_fov
+                    # drop the least recently used overlays
+                    max_size = max(1, self.settings.get('fov_cache_size', 4))
+                    while len(self.fov_cache) > max_size:
+                        self.fov_cache.popitem(last=False)
                 self.w.instrument.set_text(f"{telname}/{insname}")
                 self.mount_offset_rot_deg = self.cur_fov.mount_offset_rot_deg
 
                 # this should change the size setting in FindImage
                 self.settings.set(sky_radius_arcmin=self.cur_fov.sky_radius_arcmin)
 
-            self.redo()
+            self.redo_image()
 
     def set_pa_cb(self, w):
-        self.pa_deg = float(w.get_text().strip())
-        self.redo()
+        pa_deg = float(w.get_text().strip())
+        if math.isclose(pa_deg, self.pa_deg, rel_tol=1e-10, abs_tol=1e-10):
+            # same PA re-entered
+            return
+        self.pa_deg = pa_deg
+        self.redo_image()
 
     def toggle_flip_cb(self, w, tf):
+        if tf == self.flip:
+            return
         self.flip = tf
-        self.redo()
+        self.redo_image()
 
     def redraw_cb(self, viewer, whence):
         if not self.gui_up or whence >= 3:
             return
         # check pan location
         pos = viewer.get_pan(coord='data')[:2]
-        if self.cur_fov is not None:
-            self.cur_fov.set_pos(pos)
-
-        data_x, data_y = pos[:2]
-        image = viewer.get_image()
-        if image is not None:
-            ra_deg, dec_deg = image.pixtoradec(data_x, data_y)
-            ra_str = wcs.ra_deg_to_str(ra_deg)
-            dec_str = wcs.dec_deg_to_str(dec_deg)
-            self.w.ra.set_text(ra_str)
-            self.w.dec.set_text(dec_str)
-            header = image.get_header()
-            self.w.equinox.set_text(str(header.get('EQUINOX', '')))
+        # the scale is included because the FOV labels depend on it
+        last_pos = (pos[0], pos[1], viewer.get_scale())
+        if self.cur_fov is not None and last_pos != self._last_pos:
+            self._last_pos = last_pos
+            with viewer.suppress_redraw:
+                self.cur_fov.set_pos(pos)
 
         img_rot_deg = viewer.get_rotation()
-        if not self.flip:
-            pa_deg = self.rot_deg + self.mount_offset_rot_deg - img_rot_deg
-        else:
-            pa_deg = -self.rot_deg + self.mount_offset_rot_deg + img_rot_deg
-        self.logger.info(f"PA is now {pa_deg} deg")
-        self.w.pa.set_text("%.2f" % (pa_deg))
-        self.pa_deg = pa_deg
+        sign = -1.0 if self.flip else 1.0
+        pa_deg = sign * (self.rot_deg - img_rot_deg) + self.mount_offset_rot_deg
+        self.pa_deg = normalize_angle(pa_deg, limit='half')
+
+        # update the widgets right away if they have not been updated
+        # recently, otherwise once the update interval has passed
+        if not self.info_tmr.is_set():
+            interval = self.settings.get('pan_update_interval', 0.1)
+            wait_sec = self._info_time + interval - time.time()
+            if wait_sec <= 0.0:
+                self.update_info()
+            else:
+                self.info_tmr.start(wait_sec)
 
-    def calc_ang(self, image, righthand=False):
+    def update_info(self):
+        """Update the pointing widgets from the current pan position
+        and position angle.
+        """
+        if not self.gui_up:
+            return
+        self._info_time = time.time()
         data_x, data_y = self.viewer.get_pan(coord='data')[:2]
+        image = self.viewer.get_image()
+        if image is not None:
+            radec_pos = (id(image), data_x, data_y)
+            # a rotation alone does not move the pointing
+            if radec_pos != self._radec_pos:
+                self._radec_pos = radec_pos
+                self._refresh_radec_widgets(image, data_x, data_y)
+
+        self.logger.info(f"PA is now {self.pa_deg} deg")
+        self.w.pa.set_text("%.2f" % (self.pa_deg))
+
+    def _refresh_radec_widgets(self, image, data_x, data_y):
+        ra_deg, dec_deg = image.pixtoradec(data_x, data_y)
+        ra_str = wcs.ra_deg_to_str(ra_deg)
+        dec_str = wcs.dec_deg_to_str(dec_deg)
+        self.w.ra.set_text(ra_str)
+        self.w.dec.set_text(dec_str)
+        header = image.get_header()
+        self.w.equinox.set_text(str(header.get('EQUINOX', '')))
+
+    def get_wcs_info(self, image, data_x, data_y):
+        """Return the WCS pixel scale and the compass angles at the
+        position (data_x, data_y), reusing earlier results for the same
+        image and position.
+        """
+        key = (id(image), round(data_x, 3), round(data_y, 3))
+        info = self._wcs_cache.get(key, None)
+        if info is not None:
+            return info
+
+        header = image.get_header()
+        rot, scale = wcs.get_xy_rotation_and_scale(header)
+        scale_x, scale_y = scale
+
         (x, y, xn, yn, xe, ye) = wcs.calc_compass(image, data_x, data_y,
                                                   1.0, 1.0)
-        degn = np.degrees(np.arctan2(xn - x, yn - y))
+        # NOTE: scalars, so math is much quicker than numpy here
+        degn = math.degrees(math.atan2(xn - x, yn - y))
         self.logger.info("degn=%f xe=%f ye=%f" % (
             degn, xe, ye))
         # rotate east point also by degn
-        xe2, ye2 = trcalc.rotate_pt(xe, ye, degn, xoff=x, yoff=y)
-        dege = np.degrees(np.arctan2(xe2 - x, ye2 - y))
+        rad = math.radians(degn)
+        cos_t, sin_t = math.cos(rad), math.sin(rad)
+        a, b = xe - x, ye - y
+        xe2 = a * cos_t - b * sin_t + x
+        ye2 = a * sin_t + b * cos_t + y
+        dege = math.degrees(math.atan2(xe2 - x, ye2 - y))
         self.logger.info("dege=%f xe2=%f ye2=%f" % (
             dege, xe2, ye2))
 
+        info = (scale_x, scale_y, degn, dege)
+        if len(self._wcs_cache) >= 16:
+            # only nearby positions tend to be reused; don't grow forever
+            self._wcs_cache.clear()
+        self._wcs_cache[key] = info
+        return info
+
+    def calc_ang(self, degn, dege, righthand=False):
         # if right-hand image, flip it to make left hand
         xflip = righthand
         if dege > 0.0:
@@ -317,12 +448,87 @@ class FOV:
         self.dc = canvas.get_draw_classes()
 
         self.mount_offset_rot_deg = 0.0
+        # canvas objects making up this overlay
+        self.objs = []
+        # labels are not drawn if the overlay is smaller than this on screen
+        self.label_min_px = 20
+        self.labels_shown = True
+        self._hidden_labels = []
+
+    def add_object(self, obj):
+        """Add a canvas object belonging to this overlay."""
+        self.objs.append(obj)
+        self.canvas.add(obj)
 
     def set_pos(self, pt):
         pass
 
+    def get_labels(self):
+        """Return the Text objects belonging to this overlay."""
+        labels = []
+        for obj in self.objs:
+            for child in getattr(obj, 'objects', [obj]):
+                if child.kind == 'text':
+                    labels.append(child)
+        return labels
+
+    def _should_draw_labels(self, r_px):
+        return r_px > self.label_min_px
+
+    def show_labels(self, tf):
+        """Show or hide the text labels of this overlay."""
+        if tf == self.labels_shown:
+            return
+        self.labels_shown = tf
+        if tf:
+            for obj, text, bgalpha in self._hidden_labels:
+                obj.text = text
+                obj.bgalpha = bgalpha
+            self._hidden_labels = []
+        else:
+            # NOTE: ginga objects have no visibility flag; an empty
+            # string without a background costs nothing to render
+            self._hidden_labels = [(obj, obj.text, obj.bgalpha)
+                                   for obj in self.get_labels()]
+            for obj, text, bgalpha in self._hidden_labels:
+                obj.text = ''
+                obj.bgalpha = 0.0
+
+    def update_labels(self, r):
+        """Show the labels only if an overlay of radius `r` (in data
+        pixels) is big enough on screen for them to be legible.
+        """
+        viewer = self.canvas.viewer
+        r_px = r * viewer.get_scale()
+        self.show_labels(self._should_draw_labels(r_px))
+
+    def restore(self):
+        """Put the overlay back on the canvas after a `remove`.
+
+        This allows an overlay to be reused instead of rebuilding all of
+        its graphics objects.
+        """
+        for obj in self.objs:
+            if obj not in self.canvas:
+                self.canvas.add(obj)
+
     def remove(self):
-        pass
+        self.canvas.delete_objects([obj for obj in self.objs
+                                    if obj in self.canvas])
+
+
+@lru_cache(maxsize=360)
+def _rotation_matrix_t(theta_deg):
+    """Transposed rotation matrix for rotating row vectors by `theta_deg`
+    (same sense as ginga.trcalc.rotate_pt). Every object on the canvas is
+    rotated by the same angle, so this is mostly looked up.
+    """
+    t_rad = math.radians(theta_deg)
+    cos_t, sin_t = math.cos(t_rad), math.sin(t_rad)
+    rot_t = np.array(((cos_t, sin_t), (-sin_t, cos_t)))
+    # shared between callers
+    rot_t.flags.writeable = False
+    return rot_t
 
 
 class UnRotatedDataMapper(BaseMapper):
@@ -334,21 +540,30 @@ class UnRotatedDataMapper(BaseMapper):
         self.tr = (trcat.DataCartesianTransform(viewer) +
                    trcat.InvertedTransform(trcat.RotationFlipTransform(viewer)) +
                    trcat.InvertedTransform(trcat.DataCartesianTransform(viewer)))
+        # bind the composed transform's methods once, they are called
+        # for every object drawn
+        self._to = self.tr.to_
+        self._from = self.tr.from_
         self.viewer = viewer
 
     def to_data(self, crt_pts, viewer=None):
-        crt_arr = np.asarray(crt_pts)
-        return self.tr.to_(crt_arr)
+        crt_arr = np.asarray(crt_pts, dtype=float)
+        return self._to(crt_arr)
 
     def data_to(self, data_pts, viewer=None):
-        data_arr = np.asarray(data_pts)
-        return self.tr.from_(data_arr)
+        data_arr = np.asarray(data_pts, dtype=float)
+        return self._from(data_arr)
 
     def offset_pt(self, pts, offset):
+        # canvas objects mostly offset a single (x, y) tuple; plain
+        # addition is much faster than going through numpy for that
+        if (isinstance(pts, tuple) and len(pts) == 2 and
+                isinstance(offset, tuple) and len(offset) == 2):
+            return (pts[0] + offset[0], pts[1] + offset[1])
         return np.add(pts, offset)
 
     def rotate_pt(self, pts, theta, offset):
-        x, y = np.asarray(pts).T
-        xoff, yoff = np.transpose(offset)
-        rot_x, rot_y = trcalc.rotate_pt(x, y, theta, xoff=xoff, yoff=yoff)
-        return np.asarray((rot_x, rot_y)).T
+        # rotate all points with a single matrix multiply
+        rot_t = _rotation_matrix_t(float(theta))
+        off_arr = np.asarray(offset, dtype=float)
+        return (np.asarray(pts, dtype=float) - off_arr) @ rot_t + off_arr
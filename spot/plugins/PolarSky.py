@@ -22,6 +22,34 @@ from spot.util import calcpos
 from spot.util.rot import normalize_angle
 
 
+def _polar_to_xy(r, t_deg, scale=1.0):
+    """Convert polar coordinates (`r` deg, `t_deg` deg) to (x, y) on the
+    plot, for scalars or sequences of values.  `scale` is in pix/deg.
+    """
+    # TODO: take into account fisheye distortion
+    t_rad = np.radians(t_deg)
+    r = np.multiply(r, scale)
+
+    # cx, cy = self.settings['image_center']
+    cx, cy = 0.0, 0.0
+    return np.array((cx + r * np.cos(t_rad), cy + r * np.sin(t_rad)))
+
+
+# Positions of the fixed annotations of the polar plot, in degrees from
+# the zenith. They never change, so they are computed once here and only
+# need to be multiplied by the pix/deg scale when plotting.
+
+# azimuth labels
+_AZ_LABEL_ANGLES = [0, 45, 90, 135, 180, 225, 270, 315]
+_AZ_LABEL_XY = _polar_to_xy([92, 92, 92, 98, 100, 100, 95, 92],
+                            _AZ_LABEL_ANGLES)
+# compass directions
+_COMPASS_LABELS = ['W', 'N', 'E', 'S']
+_COMPASS_XY = _polar_to_xy([105, 100, 105, 104], [0, 90, 180, 270])
+# guide lines, as pairs of end points
+_GUIDE_LINE_XY = _polar_to_xy(90, [90, -90, 45, -135, 0, -180, -45, 135])
+
+
 class PolarSky(GingaPlugin.LocalPlugin):
     """
     PolarSky
@@ -55,6 +83,8 @@ class PolarSky(GingaPlugin.LocalPlugin):
         self.settings.load(onError='silent')
 
         self.base_circ = None
+        # pix/deg scale the current plot was drawn at
+        self._plot_scale = None
 
         self.viewer = self.fitsimage
         self.dc = fv.get_draw_classes()
@@ -69,7 +99,9 @@ class PolarSky(GingaPlugin.LocalPlugin):
         self.site_obj = None
         self.dt_utc = None
         self.cur_tz = None
-        self._last_sunmoon_update_dt = None
+        # (earliest, latest) time, as epoch secs, not needing a sun/moon
+        # update
+        self._sunmoon_update_window = None
 
         self.gui_up = False
 
@@ -308,11 +340,14 @@ class PolarSky(GingaPlugin.LocalPlugin):
 
         self.update_times()
 
-        if (self._last_sunmoon_update_dt is None or
-            abs((self.dt_utc - self._last_sunmoon_update_dt).total_seconds()) >
-            self.settings.get('times_update_interval')):
+        # NOTE: called every tick, so compare plain floats rather than
+        # building a timedelta each time
+        t_sec = time_utc.timestamp()
+        window = self._sunmoon_update_window
+        if window is None or not (window[0] <= t_sec <= window[1]):
             self.logger.info("updating sunmoon times")
-            self._last_sunmoon_update_dt = self.dt_utc
+            interval = self.settings.get('times_update_interval')
+            self._sunmoon_update_window = (t_sec - interval, t_sec + interval)
             self.fv.gui_do(self.update_sunmoon)
 
     def replot_all(self):
@@ -347,110 +382,130 @@ class PolarSky(GingaPlugin.LocalPlugin):
             self.w.moon_dec.set_text(info.moon_dec)
 
     def change_radius_cb(self, setting, radius):
-        self.replot_all()
+        self.rescale_plot()
 
     def initialize_plot(self):
-        self.canvas.delete_object_by_tag('elev')
-
-        objs = []
-
-        # colors
-        circ_color = 'cyan'
-        # circ_fill = 'palegreen1'
-        circ_fill = '#fdf6f6'
-        annot_color = 'coral2'
-
-        els = []
-        elevations = self.settings['elevations']
-        for el_deg in elevations:
-            if el_deg in self.settings['danger_elevations']:
-                linewd, color = 3, 'red'
-            elif el_deg in self.settings['warning_elevations']:
-                linewd, color = 2, 'darkorange'
-            else:
-                linewd, color = 1, circ_color
-
-            els.append((el_deg, linewd, color))
-        # plot circles
-        image = self.viewer.get_image()
-        # fillalpha = 0.5 if image is None else 0.0
-        fillalpha = 0.0
-        alpha = 1.0
-        x, y, r = self.r2xyr(90)
-        self.base_circ = self.dc.Circle(x, y, r, color=circ_color, linewidth=2,
-                                        fill=True, fillcolor=circ_fill,
-                                        fillalpha=fillalpha, alpha=1.0)
-        objs.append(self.base_circ)
-
-        x, y, r = self.r2xyr(1)
-        objs.append(self.dc.Circle(x, y, r, color=circ_color, linewidth=1))
-        t = -75
-        for el_deg, wd_px, color in els:
-            r = (90 - el_deg)
-            r2 = r + 1
-            x, y, _r = self.r2xyr(r)
-            objs.append(self.dc.Circle(x, y, _r, color=color,
-                                       linewidth=wd_px, linestyle='solid'))
-            x, y = self.p2r(r, t)
-            objs.append(self.dc.Text(x, y, "{}".format(el_deg), color=annot_color,
-                                     fontscale=True, fontsize_min=12))
-
-        # plot lines
-        for r1, t1, r2, t2 in [(90, 90, 90, -90), (90, 45, 90, -135),
-                               (90, 0, 90, -180), (90, -45, 90, 135)]:
-            x1, y1 = self.p2r(r1, t1)
-            x2, y2 = self.p2r(r2, t2)
-            objs.append(self.dc.Line(x1, y1, x2, y2, color=circ_color,
-                                     linestyle='dash'))
-
-        # plot degrees
-        _radii = [92, 92, 92, 98, 100, 100, 95, 92]
-        _azdeg = [0, 45, 90, 135, 180, 225, 270, 315]
-        _azinfo = list(zip(_radii, _azdeg))
-        status_dict = self.site_obj.get_status()
-        base = -90
-        if status_dict['azimuth_start_direction'] == 'S':
-            base = 90
-        for r, t in _azinfo:
-            ang = (t + base) % 360
-            if self.settings['limit_az_180']:
-                # NOTE: assume angles of interest are not fractional
-                ang = int(normalize_angle(ang, limit='half'))
-            x, y = self.p2r(r, t)
-            objs.append(self.dc.Text(x, y, "{}\u00b0".format(ang),
-                                     fontscale=True, fontsize_min=12,
-                                     color=annot_color))
-
-        rd = self.settings['image_radius'] * 1.25
+        # NOTE: deleting the old plot and adding the new one should
+        # result in a single redraw
+        with self.viewer.suppress_redraw:
+            self.canvas.delete_object_by_tag('elev')
+
+            objs = []
+
+            # colors
+            circ_color = 'cyan'
+            # circ_fill = 'palegreen1'
+            circ_fill = '#fdf6f6'
+            annot_color = 'coral2'
+
+            els = []
+            elevations = self.settings['elevations']
+            for el_deg in elevations:
+                if el_deg in self.settings['danger_elevations']:
+                    linewd, color = 3, 'red'
+                elif el_deg in self.settings['warning_elevations']:
+                    linewd, color = 2, 'darkorange'
+                else:
+                    linewd, color = 1, circ_color
+
+                els.append((el_deg, linewd, color))
+            # plot circles
+            image = self.viewer.get_image()
+            # fillalpha = 0.5 if image is None else 0.0
+            fillalpha = 0.0
+            alpha = 1.0
+            x, y, r = self.r2xyr(90)
+            self.base_circ = self.dc.Circle(x, y, r, color=circ_color, linewidth=2,
+                                            fill=True, fillcolor=circ_fill,
+                                            fillalpha=fillalpha, alpha=1.0)
+            objs.append(self.base_circ)
+
+            x, y, r = self.r2xyr(1)
+            objs.append(self.dc.Circle(x, y, r, color=circ_color, linewidth=1))
+            # NOTE: label and line positions are computed together for each
+            # kind of annotation, rather than point by point
+            radii = [90 - el_deg for el_deg, wd_px, color in els]
+            xs, ys = self.p2r_arr(radii, [-75] * len(radii))
+            for (el_deg, wd_px, color), r, x, y in zip(els, radii, xs, ys):
+                cx, cy, _r = self.r2xyr(r)
+                objs.append(self.dc.Circle(cx, cy, _r, color=color,
+                                           linewidth=wd_px, linestyle='solid'))
+                objs.append(self.dc.Text(x, y, "{}".format(el_deg), color=annot_color,
+                                         fontscale=True, fontsize_min=12))
+
+            scale = self.get_scale()
+
+            # plot lines
+            xs, ys = _GUIDE_LINE_XY * scale
+            for x1, y1, x2, y2 in zip(xs[0::2], ys[0::2], xs[1::2], ys[1::2]):
+                objs.append(self.dc.Line(x1, y1, x2, y2, color=circ_color,
+                                         linestyle='dash'))
+
+            # plot degrees
+            xs, ys = _AZ_LABEL_XY * scale
+            status_dict = self.site_obj.get_status()
+            base = -90
+            if status_dict['azimuth_start_direction'] == 'S':
+                base = 90
+            for t, x, y in zip(_AZ_LABEL_ANGLES, xs, ys):
+                ang = (t + base) % 360
+                if self.settings['limit_az_180']:
+                    # NOTE: assume angles of interest are not fractional
+                    ang = int(normalize_angle(ang, limit='half'))
+                objs.append(self.dc.Text(x, y, "{}\u00b0".format(ang),
+                                         fontscale=True, fontsize_min=12,
+                                         color=annot_color))
+
+            # plot compass directions
+            xs, ys = _COMPASS_XY * scale
+            for txt, x, y in zip(_COMPASS_LABELS, xs, ys):
+                objs.append(self.dc.Text(x, y, txt, color=annot_color,
+                                         fontscale=True, fontsize_min=16))
+
+            o = self.dc.CompoundObject(*objs)
+            self.canvas.add(o, tag='elev')
+            self._plot_scale = scale
+
+            self.set_plot_limits()
+
+    def rescale_plot(self):
+        """Resize the existing plot for a changed image radius."""
+        try:
+            o = self.canvas.get_object_by_tag('elev')
+        except KeyError:
+            self.initialize_plot()
+            return
 
-        # plot compass directions
-        for r, t, txt in [(105, 0, 'W'), (100, 90, 'N'),
-                          (105, 180, 'E'), (104, 270, 'S')]:
-            x, y = self.p2r(r, t)
-            objs.append(self.dc.Text(x, y, txt, color=annot_color,
-                                     fontscale=True, fontsize_min=16))
+        # everything in the plot is centered on (0, 0), so changing the
+        # radius only scales it; no need to build it again
+        scale = self.get_scale()
+        factor = scale / self._plot_scale
+        with self.viewer.suppress_redraw:
+            for obj in o.objects:
+                obj.points *= factor
+                if hasattr(obj, 'radius'):
+                    obj.radius *= factor
+            self._plot_scale = scale
 
-        o = self.dc.CompoundObject(*objs)
-        self.canvas.add(o, tag='elev')
+            self.set_plot_limits()
+            self.canvas.update_canvas(whence=3)
 
+    def set_plot_limits(self):
+        rd = self.settings['image_radius'] * 1.25
         with self.viewer.suppress_redraw:
             self.viewer.set_limits(((-rd, -rd), (rd, rd)))
             self.viewer.zoom_fit()
             self.viewer.set_pan(0.0, 0.0)
 
     def p2r(self, r, t):
-        # TODO: take into account fisheye distortion
-        t_rad = np.radians(t)
-
-        # cx, cy = self.settings['image_center']
-        cx, cy = 0.0, 0.0
-        scale = self.get_scale()
-
-        x = cx + r * np.cos(t_rad) * scale
-        y = cy + r * np.sin(t_rad) * scale
-
+        x, y = _polar_to_xy(r, t, self.get_scale()).tolist()
         return (x, y)
 
+    def p2r_arr(self, r_arr, t_arr):
+        """Like p2r(), but for sequences of (r, t) values."""
+        x_arr, y_arr = _polar_to_xy(r_arr, t_arr, self.get_scale())
+        return (x_arr, y_arr)
+
     def r2xyr(self, r):
         # TODO: take into account fisheye distortion
         # cx, cy = self.settings['image_center']
@@ -469,6 +524,11 @@ class PolarSky(GingaPlugin.LocalPlugin):
     def map_azalt(self, az, alt):
         return az + 90.0, 90.0 - alt
 
+    def azalt_to_xy(self, az, alt):
+        """Return the plot (x, y) position of (`az`, `alt`) deg."""
+        t, r = self.map_azalt(az, alt)
+        return self.p2r(r, t)
+
     def r2p(self, x, y):
         r = np.sqrt(x ** 2 + y ** 2)
         t = np.arctan(y / x)
@@ -78,6 +78,7 @@ naojsoft packages
 """
 # stdlib
 import os
+import math
 import time
 import datetime
 
@@ -343,7 +344,7 @@ class SkyCam(GingaPlugin.LocalPlugin):
         data_np = img._slice(view)
 
         # rotate image as necessary
-        if not np.isclose(rot_deg, 0.0):
+        if not math.isclose(rot_deg, 0.0, abs_tol=1e-8):
             ht, wd = data_np.shape[:2]
             ctr_x, ctr_y = wd // 2, ht // 2
             data_np = trcalc.rotate_clip(data_np, rot_deg,
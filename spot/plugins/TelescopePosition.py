@@ -74,12 +74,30 @@ class TelescopePosition(GingaPlugin.LocalPlugin):
                                    slew_distance_threshold=0.05,
                                    telescope_update_interval=3.0)
         self.settings.load(onError='silent')
+        # these are needed on every telescope update, so are kept here
+        # and refreshed if the settings change
+        self._tel_fov_deg = self.settings['tel_fov_deg']
+        self._slew_threshold = self.settings['slew_distance_threshold']
+        for key in ['tel_fov_deg', 'slew_distance_threshold']:
+            self.settings.get_setting(key).add_callback(
+                'set', self.plot_settings_changed_cb)
 
         self.site = None
-        # Az, Alt/El current tel position and commanded position
-        self.telescope_pos = [-90.0, 89.5]
-        self.telescope_cmd = [-90.0, 89.5]
-        self.telescope_diff = [0.0, 0.0]
+        # Az, Alt/El current tel position, commanded position and the
+        # difference between them, one row each
+        self.telescope_posns = np.array(((-90.0, 89.5),
+                                         (-90.0, 89.5),
+                                         (0.0, 0.0)))
+        # (views of the rows above)
+        (self.telescope_pos, self.telescope_cmd,
+         self.telescope_diff) = self.telescope_posns
+        # last status shown
+        self._last_status = None
+        # (scale, rotate view), positions last plotted
+        self._last_tel = None
+        # (scale, telescope FOV radius and label offset in pix at that
+        # scale), for the marker sizes
+        self._tel_sizes = None
 
         self.viewer = self.fitsimage
         self.dc = fv.get_draw_classes()
@@ -120,6 +138,8 @@ class TelescopePosition(GingaPlugin.LocalPlugin):
                                  fontscale=True, fontsize_min=12,
                                  rot_deg=-45.0))
         self.tel_obj = self.dc.CompoundObject(*objs)
+        # whether tel_obj is on our canvas
+        self._tel_added = False
 
         self.tmr = GwHelp.Timer(duration=self.settings['telescope_update_interval'])
         self.tmr.add_callback('expired', self.update_tel_timer_cb)
@@ -219,8 +239,12 @@ class TelescopePosition(GingaPlugin.LocalPlugin):
         self.canvas.delete_all_objects()
 
         self.canvas.add(self.tel_obj, tag='telescope', redraw=False)
+        self._tel_added = True
+        self._last_tel = None
         self.update_telescope_plot()
 
+        self._last_status = None
+
         self.update_tel_timer_cb(self.tmr)
 
     def stop(self):
@@ -240,20 +264,43 @@ class TelescopePosition(GingaPlugin.LocalPlugin):
         if not self.gui_up:
             return
         if not self.w.plot_telescope_position.get_state():
-            try:
-                self.canvas.delete_object_by_tag('telescope')
-            except KeyError:
-                pass
+            if self._tel_added:
+                try:
+                    self.canvas.delete_object_by_tag('telescope')
+                except KeyError:
+                    pass
+                self._tel_added = False
+            self._last_tel = None
             return
 
-        if self.tel_obj not in self.canvas:
+        # NOTE: a flag, rather than searching the canvas on every update
+        if not self._tel_added:
             self.canvas.add(self.tel_obj, tag='telescope', redraw=False)
+            self._tel_added = True
 
-        az, alt = self.telescope_pos
-        az_cmd, alt_cmd = self.telescope_cmd
+        # NOTE: python floats are quicker than numpy scalars for the
+        # scalar math below
+        (az, alt), (az_cmd, alt_cmd), (az_dif, alt_dif) = \
+            self.telescope_posns.tolist()
         scale = self.get_scale()
-        rd = self.settings.get('tel_fov_deg') * 0.5 * scale
-        off = 4 * scale
+        rotate_view = self.w.rotate_view_to_azimuth.get_state()
+
+        # skip the update if nothing has moved by a visible amount
+        posns = (az, alt, az_cmd, alt_cmd, az_dif, alt_dif)
+        last = self._last_tel
+        if (last is not None and last[0] == (scale, rotate_view) and
+                all(abs(val - last_val) < 0.01
+                    for val, last_val in zip(posns, last[1]))):
+            # markers are in place, but the view may have been rotated
+            # by something else
+            self.update_view_rotation(self.site.az_to_norm(az), rotate_view)
+            return
+        self._last_tel = ((scale, rotate_view), posns)
+
+        if self._tel_sizes is None or self._tel_sizes[0] != scale:
+            self._tel_sizes = (scale, self._tel_fov_deg * 0.5 * scale,
+                               4 * scale)
+        _scale, rd, off = self._tel_sizes
 
         (tel_circ, tel_line, tel_text, line, bcurve, cmd_circ,
          cmd_line, cmd_text) = self.tel_obj.objects
@@ -261,8 +308,7 @@ class TelescopePosition(GingaPlugin.LocalPlugin):
         self.logger.debug(f'updating tel posn to alt={alt},az={az}')
         az = self.site.az_to_norm(az)
         az_cmd = self.site.az_to_norm(az_cmd)
-        t, r = self.map_azalt(az, alt)
-        x0, y0 = self.p2r(r, t)
+        x0, y0 = self.azalt_to_xy(az, alt)
         self.logger.debug(f'updating tel posn to x={x0},y={y0}')
         tel_circ.x, tel_circ.y = x0, y0
         tel_line.x1, tel_line.y1 = x0 + rd, y0 + rd
@@ -271,11 +317,9 @@ class TelescopePosition(GingaPlugin.LocalPlugin):
         line.x1, line.y1 = x0, y0
 
         # calculate distance to commanded position
-        az_dif, alt_dif = self.telescope_diff[:2]
         delta_deg = math.fabs(az_dif) + math.fabs(alt_dif)
 
-        threshold = self.settings.get('slew_distance_threshold')
-        if delta_deg < threshold:
+        if delta_deg < self._slew_threshold:
             # line.alpha, cmd_circ.alpha = 0.0, 0.0
             line.alpha = 0.0
             bcurve.alpha = 0.0
@@ -286,35 +330,37 @@ class TelescopePosition(GingaPlugin.LocalPlugin):
 
         # this will be the point directly down the elevation
         # the line will follow this path
-        t, r = self.map_azalt(az, alt_cmd)
-        origin = (t, r)
-        x1, y1 = self.p2r(r, t)
+        origin = self.map_azalt(az, alt_cmd)
+        x1, y1 = self.azalt_to_xy(az, alt_cmd)
         line.x2, line.y2 = x1, y1
 
         # calculate the point at the destination
         # the curve will follow this path around the azimuth
-        t, r = self.map_azalt(az_cmd, alt_cmd)
-        dest = (t, r)
-        x2, y2 = self.p2r(r, t)
+        dest = self.map_azalt(az_cmd, alt_cmd)
+        x2, y2 = self.azalt_to_xy(az_cmd, alt_cmd)
         cmd_circ.x, cmd_circ.y = x2, y2
         cmd_line.x1, cmd_line.y1 = x2 - rd, y2 - rd
         cmd_line.x2, cmd_line.y2 = x2 - rd - off, y2 - rd - off
         cmd_text.x, cmd_text.y = x2 - rd - off, y2 - rd - off
 
-        direction = int(np.sign(az_dif))
-        if np.isclose(direction, 0.0):
-            direction = 1
+        # NOTE: zero difference counts as positive direction
+        direction = -1 if az_dif < 0.0 else 1
         bcurve.points = self.get_arc_points(origin, dest, direction)
 
         with self.fitsimage.suppress_redraw:
-            if self.w.rotate_view_to_azimuth.get_state():
-                # rotate view to telescope azimuth
-                rot_deg = - az
-            else:
-                rot_deg = 0.0
-            self.fitsimage.rotate(rot_deg)
+            self.update_view_rotation(az, rotate_view)
             self.canvas.update_canvas(whence=3)
 
+    def update_view_rotation(self, az, rotate_view):
+        if rotate_view:
+            # rotate view to telescope azimuth
+            rot_deg = - az
+        else:
+            rot_deg = 0.0
+        # rotating redraws the whole view; skip changes too small to see
+        if abs(rot_deg - self.fitsimage.get_rotation()) > 0.01:
+            self.fitsimage.rotate(rot_deg)
+
     def update_info(self, status):
         try:
             self.w.ra.set_text(wcs.ra_deg_to_str(status.ra_deg))
@@ -334,19 +380,18 @@ class TelescopePosition(GingaPlugin.LocalPlugin):
             self.logger.error(f"error updating info: {e}", exc_info=True)
 
     def update_status(self, status):
-        self.telescope_pos[0] = status.az_deg
-        self.telescope_pos[1] = status.alt_deg
-
-        self.telescope_cmd[0] = status.az_cmd_deg
-        self.telescope_cmd[1] = status.alt_cmd_deg
-
-        self.telescope_diff[0] = status.az_diff_deg
-        self.telescope_diff[1] = status.alt_diff_deg
+        self.telescope_posns[:] = ((status.az_deg, status.alt_deg),
+                                   (status.az_cmd_deg, status.alt_cmd_deg),
+                                   (status.az_diff_deg, status.alt_diff_deg))
 
         if not self.gui_up:
             return
-
-        self.fv.gui_do(self.update_info, status)
+        # status is polled, so is often unchanged; the plot is updated
+        # regardless, as the scale may have changed (update_telescope_plot
+        # skips the work if nothing did)
+        if status != self._last_status:
+            self._last_status = status
+            self.fv.gui_do(self.update_info, status)
         self.fv.gui_do(self.update_telescope_plot)
 
     def update_tel_timer_cb(self, timer):
@@ -360,11 +405,19 @@ class TelescopePosition(GingaPlugin.LocalPlugin):
     def site_changed_cb(self, cb, site_obj):
         self.logger.debug("site has changed")
         self.site = site_obj
+        self._last_status = None
+        self._last_tel = None
 
         obj = self.channel.opmon.get_plugin('SiteSelector')
         status = obj.get_status()
         self.update_status(status)
 
+    def plot_settings_changed_cb(self, setting, value):
+        self._tel_fov_deg = self.settings['tel_fov_deg']
+        self._slew_threshold = self.settings['slew_distance_threshold']
+        self._tel_sizes = None
+        self._last_tel = None
+
     def tel_posn_toggle_cb(self, w, tf):
         self.fv.gui_do(self.update_telescope_plot)
 
@@ -380,6 +433,10 @@ class TelescopePosition(GingaPlugin.LocalPlugin):
         obj = self.channel.opmon.get_plugin('PolarSky')
         return obj.map_azalt(az, alt)
 
+    def azalt_to_xy(self, az, alt):
+        obj = self.channel.opmon.get_plugin('PolarSky')
+        return obj.azalt_to_xy(az, alt)
+
     def get_arc_points(self, origin, dest, direction):
         t, r = origin
         t = normalize_angle(int(t), limit='full')
@@ -2,6 +2,7 @@
 # rot.py -- rotation calculations
 #
 from collections import namedtuple
+import math
 
 import numpy as np
 
@@ -67,8 +68,10 @@ def normalize_angle(ang_deg, limit=None, ang_offset=0):
     ang_deg = ang_deg + ang_offset
 
     # constrain to -360, +360
-    if np.fabs(ang_deg) >= 360.0:
-        ang_deg = np.remainder(ang_deg, np.sign(ang_deg) * 360.0)
+    # NOTE: called with scalars, for which math is much faster than numpy;
+    # fmod keeps the sign of the angle, like the remainder by sign*360 did
+    if abs(ang_deg) >= 360.0:
+        ang_deg = math.fmod(ang_deg, 360.0)
     if limit is None:
         return ang_deg
 
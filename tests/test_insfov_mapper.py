@@ -0,0 +1,51 @@
+import pytest
+import numpy as np
+from ginga import trcalc
+from ginga.misc.log import get_logger
+from ginga.pilw.ImageViewPil import CanvasView
+
+import spot.instruments  # noqa: F401 (resolves import order for InsFov)
+from spot.plugins.InsFov import UnRotatedDataMapper
+
+
+@pytest.fixture
+def mapper():
+    logger = get_logger('test', null=True)
+    viewer = CanvasView(logger=logger)
+    viewer.set_window_size(400, 400)
+    return UnRotatedDataMapper(viewer)
+
+
+ANGLES = [0.0, 30.0, 90.0, 137.5, -45.0, -200.0, 400.0, 725.25]
+
+
+class TestUnRotatedDataMapper:
+
+    @pytest.mark.parametrize("theta", ANGLES)
+    def test_rotate_pt_tuple(self, mapper, theta):
+        pt, off = (12.5, -3.0), (100.0, 250.0)
+        x, y = mapper.rotate_pt(pt, theta, off)
+        x_ref, y_ref = trcalc.rotate_pt(pt[0], pt[1], theta,
+                                        xoff=off[0], yoff=off[1])
+        assert np.isclose(x, x_ref)
+        assert np.isclose(y, y_ref)
+
+    @pytest.mark.parametrize("theta", ANGLES)
+    def test_rotate_pt_array(self, mapper, theta):
+        rng = np.random.default_rng(42)
+        pts = rng.uniform(-1000.0, 1000.0, size=(50, 2))
+        off = (-20.0, 35.5)
+        res = mapper.rotate_pt(pts, theta, off)
+        x_ref, y_ref = trcalc.rotate_pt(pts[:, 0], pts[:, 1], theta,
+                                        xoff=off[0], yoff=off[1])
+        assert res.shape == pts.shape
+        assert np.allclose(res[:, 0], x_ref)
+        assert np.allclose(res[:, 1], y_ref)
+
+    def test_offset_pt_tuple(self, mapper):
+        assert mapper.offset_pt((1.5, -2.0), (10.0, 20.0)) == (11.5, 18.0)
+
+    def test_offset_pt_array(self, mapper):
+        pts = np.array([[0.0, 0.0], [1.0, 2.0], [-3.5, 4.0]])
+        res = mapper.offset_pt(pts, (10.0, -1.0))
+        assert np.allclose(res, pts + np.array([10.0, -1.0]))
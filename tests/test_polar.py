@@ -0,0 +1,30 @@
+import math
+
+import numpy as np
+
+from spot.util.polar import subaru_normalize_az
+
+
+def subaru_normalize_az_ref(az_deg):
+    # reference implementation, using fmod and sign checks
+    az_deg = az_deg + 180.0
+    if math.fabs(az_deg) >= 360.0:
+        az_deg = math.fmod(az_deg, 360.0)
+    if az_deg < 0.0:
+        az_deg += 360.0
+    return az_deg
+
+
+class TestSubaruNormalizeAz:
+
+    def test_matches_reference(self):
+        for az in np.linspace(-1000.0, 1000.0, 4001):
+            assert np.isclose(subaru_normalize_az(az),
+                              subaru_normalize_az_ref(az))
+
+    def test_range(self):
+        assert subaru_normalize_az(0.0) == 180.0
+        assert subaru_normalize_az(-180.0) == 0.0
+        assert subaru_normalize_az(180.0) == 0.0
+        assert subaru_normalize_az(-270.0) == 270.0
+        assert subaru_normalize_az(270.0) == 90.0
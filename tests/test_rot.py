@@ -0,0 +1,35 @@
+import numpy as np
+
+from spot.util.rot import normalize_angle
+
+
+def normalize_angle_np(ang_deg, limit=None, ang_offset=0):
+    # numpy based reference implementation
+    ang_deg = ang_deg + ang_offset
+    if np.fabs(ang_deg) >= 360.0:
+        ang_deg = np.remainder(ang_deg, np.sign(ang_deg) * 360.0)
+    if limit is None:
+        return ang_deg
+    if ang_deg < 0.0:
+        ang_deg += 360.0
+    if limit != 'half':
+        return ang_deg
+    if ang_deg > 180.0:
+        ang_deg -= 360.0
+    return ang_deg
+
+
+class TestNormalizeAngle:
+
+    def test_matches_numpy(self):
+        for ang in np.linspace(-1000.0, 1000.0, 2001):
+            for limit in (None, 'full', 'half'):
+                assert np.isclose(normalize_angle(ang, limit=limit),
+                                  normalize_angle_np(ang, limit=limit))
+
+    def test_limits(self):
+        assert normalize_angle(-720.0) == 0.0
+        assert normalize_angle(370, limit='full') == 10.0
+        assert normalize_angle(-90, limit='full') == 270
+        assert normalize_angle(270.0, limit='half') == -90.0
+        assert normalize_angle(10.0, limit='half', ang_offset=360.0) == 10.0
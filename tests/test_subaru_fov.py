@@ -0,0 +1,42 @@
+import pytest
+import numpy as np
+from astropy.coordinates import Angle
+from astropy import units as u
+
+import spot.instruments  # noqa: F401 (resolves import order for subaru)
+from spot.instruments.subaru import calc_pa_hds_noimr
+
+
+def calc_pa_hds_noimr_astropy(dec_deg, ha_hr, lat_deg):
+    # reference implementation, wrapping the angle with astropy
+    lat_rad = np.radians(lat_deg)
+    dec_rad = np.radians(dec_deg)
+    ha_rad = np.radians(ha_hr * 15.0)
+
+    p_deg = np.degrees(np.arctan2((np.tan(lat_rad) * np.cos(dec_rad) -
+                                   np.sin(dec_rad) * np.cos(ha_rad)),
+                                  np.sin(ha_rad)))
+    z_deg = np.degrees(np.arccos(np.sin(lat_rad) * np.sin(dec_rad) +
+                                 np.cos(lat_rad) * np.cos(dec_rad) *
+                                 np.cos(ha_rad)))
+    pa_ang = Angle((-(p_deg - z_deg) - 58.4) * u.deg)
+    return pa_ang.wrap_at(180 * u.deg).value
+
+
+class TestHDS_PA_NoIMR:
+
+    @pytest.mark.parametrize("lat_deg", [19.825, -30.24, 0.0])
+    def test_matches_astropy(self, lat_deg):
+        for dec_deg in np.linspace(-85.0, 85.0, 35):
+            for ha_hr in np.linspace(-11.5, 11.5, 47):
+                expected = calc_pa_hds_noimr_astropy(dec_deg, ha_hr, lat_deg)
+                result = calc_pa_hds_noimr(dec_deg, ha_hr, lat_deg)
+                assert np.isclose(result, expected, atol=1e-9), \
+                    Exception("PA differs at dec={}, ha={}: {} vs. {}".format(
+                        dec_deg, ha_hr, result, expected))
+
+    def test_range(self):
+        for dec_deg in np.linspace(-85.0, 85.0, 35):
+            for ha_hr in np.linspace(-11.5, 11.5, 47):
+                result = calc_pa_hds_noimr(dec_deg, ha_hr, 19.825)
+                assert -180.0 <= result < 180.0